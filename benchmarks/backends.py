@@ -0,0 +1,91 @@
+"""Compares the pmap backends on CPU-bound work, reporting how long a
+pool takes to start, how long the work takes, and roughly how much
+memory each worker uses.
+
+Usage: python benchmarks/backends.py [--items N] [--size N] [--workers N]
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from pbatch import workers  # noqa: E402
+
+try:
+    import resource
+except ImportError:  # windows
+    resource = None  # type: ignore
+
+
+def rss_bytes() -> int:
+    """The current resident memory of this process (in bytes), or 0 if
+    it cannot be determined"""
+
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        return 0
+
+
+def max_child_rss_bytes() -> int:
+    """The peak resident memory of the largest finished child process
+    (in bytes), or 0 if it cannot be determined"""
+
+    if resource is None:
+        return 0
+
+    max_rss = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    # kilobytes on linux, bytes on macos
+    return max_rss if sys.platform == "darwin" else max_rss * 1024
+
+
+def benchmark(backend: str, items: int, size: int, max_workers: int):
+    rss_before = rss_bytes()
+
+    start = time.perf_counter()
+    pool = workers.WorkerPool(backend, max_workers=max_workers)
+    # occupy every worker at once, so that all of them are started
+    list(pool.executor.map(time.sleep, [0.1] * max_workers))
+    startup = time.perf_counter() - start - 0.1
+
+    # measured before any work runs, so that only the cost of the
+    # workers themselves is counted
+    worker_rss = (rss_bytes() - rss_before) / max_workers
+
+    start = time.perf_counter()
+    list(pool.executor.map(sum, [range(size)] * items))
+    duration = time.perf_counter() - start
+
+    pool.shutdown()
+
+    if pool.backend == workers.PROCESS_BACKEND:
+        # workers live in their own processes, whose memory is only
+        # reported once they have exited
+        worker_rss = max_child_rss_bytes()
+
+    return pool.backend, startup, duration, worker_rss
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=32, help="number of items to map")
+    parser.add_argument("--size", type=int, default=2_000_000, help="length of the range summed by each item")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="number of workers per backend")
+    args = parser.parse_args()
+
+    print(f"python {sys.version.split()[0]}, GIL {'enabled' if workers.gil_enabled() else 'disabled'}")
+    print(f"{'backend':<24}{'startup (ms)':>14}{'work (s)':>12}{'memory/worker (KB)':>20}")
+
+    for backend in workers.BACKENDS:
+        used, startup, duration, worker_rss = benchmark(backend, args.items, args.size, args.workers)
+        name = backend if used == backend else f"{backend} ({used})"
+        print(f"{name:<24}{startup * 1000:>14.1f}{duration:>12.2f}{worker_rss / 2 ** 10:>20.0f}")
+
+
+if __name__ == "__main__":
+    main()
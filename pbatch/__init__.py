@@ -1,4 +1,5 @@
-from .main import PMapException, partition, pmap, postpone
+from .main import PMapException, partition, pmap, postpone, wait_all
 from .version import VERSION
+from .workers import worker_context
 
-__all__ = ["PMapException", "partition", "pmap", "postpone", "VERSION"]
+__all__ = ["PMapException", "partition", "pmap", "postpone", "wait_all", "worker_context", "VERSION"]
@@ -1,9 +1,22 @@
 import asyncio
+import functools
 import itertools
-from typing import Any, Callable, Coroutine, Generator, Iterable, List, Optional, Tuple, TypeVar
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Executor, Future, wait
+from typing import Any, Callable, Coroutine, Generator, Iterable, List, Optional, Set, Tuple, TypeVar, Union
+
+from .workers import THREAD_BACKEND, WorkerPool, resolve_backend, shared_executor
 
 OutputType = TypeVar("OutputType")
 
+_AUTO_BATCH_SIZE = "auto"
+
+# When batch sizes are chosen automatically, aim for each batch to
+# occupy a worker for roughly this long, so that the cost of handing a
+# batch to a worker is small relative to the work it contains
+_TARGET_BATCH_SECONDS = 0.002
+
 
 def partition(items: Iterable[OutputType], chunk_size: Optional[int]) -> Iterable[List[OutputType]]:
     """Partition an iterable of items into lists of at most the specified
@@ -31,19 +44,111 @@ class Postpone:
     """Runs the provided function (with arguments) in the background, not
     blocking until Postpone.wait() is called.
 
+    Any arguments that are themselves Postpone instances are replaced
+    by their results, and the function only starts once all of them
+    have finished. If one of them raises an exception (or is
+    cancelled), this Postpone does the same without running the
+    function.
+
     Has attributes `loop` and `task` containing the asyncio event loop
-    and Task objects for the postponed execution
+    and Task objects for the postponed execution, and `future`
+    containing the underlying concurrent.futures.Future
     """
 
-    def __init__(self, f: Callable[..., OutputType], args, kwargs):
+    def __init__(self, f: Callable[..., OutputType], args, kwargs, backend: str = THREAD_BACKEND):
+        self.f = f
+        self.args = args
+        self.kwargs = kwargs
+        self.backend = resolve_backend(backend)
+
+        self.future: Future = Future()
         self.loop = asyncio.new_event_loop()
-        self.task = _run_in_background(f, self.loop, args, kwargs)
+        self.task = asyncio.wrap_future(self.future, loop=self.loop)
+
+        self._lock = threading.Lock()
+        self._running: Optional[Future] = None
+
+        dependencies = {id(arg): arg for arg in itertools.chain(args, kwargs.values()) if isinstance(arg, Postpone)}
+        self._remaining_dependencies = len(dependencies)
+        self._settled = False
+        self.future.add_done_callback(self._mark_settled)
+
+        if not dependencies:
+            self._start()
+
+        for dependency in dependencies.values():
+            dependency.future.add_done_callback(self._dependency_done)
+
+    def _mark_settled(self, _: Future):
+        self._settled = True
+
+    def _dependency_done(self, dependency: Future):
+        # e.g. cancelled while still waiting for its dependencies
+        if self._settled:
+            return
+
+        if dependency.cancelled():
+            self.future.cancel()
+        elif dependency.exception() is not None:
+            self._settle(dependency)
+        else:
+            with self._lock:
+                self._remaining_dependencies -= 1
+                ready = self._remaining_dependencies == 0
+
+            if ready:
+                self._start()
+
+    def _start(self):
+        if self._settled:
+            return
+
+        args = [_resolve(arg) for arg in self.args]
+        kwargs = {key: _resolve(value) for key, value in self.kwargs.items()}
+
+        try:
+            if self.backend == THREAD_BACKEND:
+                # a thread of its own (rather than a bounded pool), so
+                # that postponed functions can wait on other postponed
+                # functions, and any number of them can block at once
+                self._running = _run_in_thread(self.f, args, kwargs)
+            else:
+                self._running = shared_executor(self.backend).submit(self.f, *args, **kwargs)
+        except Exception as e:
+            # e.g. the shared pool has already been shut down
+            self._running = Future()
+            self._running.set_exception(e)
+
+        # cancel() may have been called while submitting, before it could
+        # see the running future
+        if self.future.cancelled():
+            self._running.cancel()
+
+        self._running.add_done_callback(self._settle)
+
+    def _settle(self, source: Future):
+        with self._lock:
+            if self.future.done() or not self.future.set_running_or_notify_cancel():
+                return
+
+        if source.cancelled():
+            self.future.set_exception(asyncio.CancelledError())
+        elif source.exception() is not None:
+            self.future.set_exception(source.exception())  # type: ignore
+        else:
+            self.future.set_result(source.result())
 
     def cancel(self):
-        """Cancels the task, even if it is not yet finished"""
+        """Cancels the task, even if it is not yet finished. Any Postpone
+        depending on this one is cancelled as well.
+        """
 
         try:
+            self._settled = True
             self.task.cancel()
+            self.future.cancel()
+            if self._running is not None:
+                self._running.cancel()
         finally:
             self.loop.close()
 
@@ -66,23 +171,77 @@ class Postpone:
             self.loop.close()
 
 
-def postpone(_pbatch_f: Callable[..., OutputType], *args, **kwargs):
+def _run_in_thread(f: Callable[..., OutputType], args, kwargs) -> Future:
+    future: Future = Future()
+
+    def run():
+        if future.set_running_or_notify_cancel():
+            try:
+                future.set_result(f(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    threading.Thread(target=run).start()
+    return future
+
+
+def _resolve(arg):
+    return arg.future.result() if isinstance(arg, Postpone) else arg
+
+
+def postpone(_pbatch_f: Callable[..., OutputType], *args, _pbatch_backend: str = THREAD_BACKEND, **kwargs):
     """Runs the provided function (with arguments) in the background, not
     blocking until Postpone.wait() is called.
 
+    Arguments may be other Postpone instances, in which case the
+    function is called with their results as soon as they are all
+    available. Independent postponed functions run concurrently, each
+    in its own thread (or on a shared pool of processes or
+    interpreters, for those backends).
+
     :param _pbatch_f: The function to postpone
     :param *args: Positional arguments to pass to the function
+    :param _pbatch_backend: (optional) The kind of worker to run the
+        function in, with the same options as the `backend` of pmap.
+        Defaults to "thread"
     :param **kwargs: Keyword arguments to pass to the function
 
     :return: A Postpone instance with `.wait()` functionality
     """
 
-    return Postpone(_pbatch_f, args, kwargs)
+    return Postpone(_pbatch_f, args, kwargs, _pbatch_backend)
+
+
+def wait_all(postponements: Iterable[Postpone]) -> List[Any]:
+    """Waits for every provided Postpone to complete, and returns their
+    results in order.
+
+    :param postponements: The Postpone instances to wait for
+
+    :return: A list of the results of each Postpone
+
+    :raises: PMapException if any of the postponed functions raised an
+        exception (or were cancelled), after all of them have completed
+    """
+
+    results = []
+    exceptions = []
+    for postponement in postponements:
+        try:
+            results.append(postponement.wait())
+        except (Exception, asyncio.CancelledError) as e:
+            results.append(e)
+            exceptions.append(e)
+
+    if exceptions:
+        raise PMapException(results, exceptions)
+
+    return results
 
 
 class PMapException(Exception):
-    """An exception to hold results and exceptions from a pmap execution,
-    when exceptions were raised within tasks.
+    """An exception to hold results and exceptions from a pmap execution
+    (or wait_all), when exceptions were raised within tasks.
 
     :param results: A list of all results from the pmap, in
         order. Includes exception instances in place of results if an
@@ -107,6 +266,10 @@ def pmap(
     iterable: Iterable,
     *iterables: Iterable,
     chunk_size: int = None,
+    batch_size: Union[int, str, None] = None,
+    backend: str = THREAD_BACKEND,
+    initializer: Optional[Callable[[], Any]] = None,
+    teardown: Optional[Callable[[Any], Any]] = None,
 ) -> Generator[OutputType, None, None]:
     """Maps a function over the provided arguments, in parallel. If
     multiple iterables are provided, the function must accept that
@@ -124,8 +287,28 @@ def pmap(
     :param chunk_size: (optional) The maximum number of items to run
         at any given time. If None, all items will be executed at the
         same time. Defaults to None
-    :param lazy: Whether or not to lazily process chunks when
-        requested, defaults to False
+    :param batch_size: (optional) If provided, items are sent to the
+        workers in batches of this many items instead of being
+        scheduled one at a time through asyncio, which greatly reduces
+        the per-item overhead for small functions. If "auto", batch
+        sizes are chosen from the measured time per item. Defaults to
+        None
+    :param backend: (optional) The kind of workers to execute the
+        function in: "thread", "process", "interpreter" (one
+        subinterpreter per worker, python 3.14+) or "auto" (threads
+        on free-threaded builds, otherwise interpreters if available).
+        Backends that are not supported by the running interpreter
+        fall back to "thread". With "process" and "interpreter", the
+        function and its arguments must be picklable. Defaults to
+        "thread"
+    :param initializer: (optional) A function of no arguments, called
+        once in each worker before it processes any items. Its return
+        value (such as a database connection) can be accessed from the
+        mapped function with `pbatch.worker_context()`. Defaults to
+        None
+    :param teardown: (optional) A function called with each worker's
+        initializer result once all items are processed, e.g. to close
+        connections. Defaults to None
 
     :return: A list of return values for each function call (in the
         same order as the items coming in)
@@ -135,7 +318,21 @@ def pmap(
     """
 
     partitions = partition(zip(iterable, *iterables), chunk_size)
-    async_mapper = _make_async_mapper(f)
+    pool = WorkerPool(backend, initializer=initializer, teardown=teardown)
+
+    try:
+        if batch_size is not None:
+            yield from _batch_map(f, partitions, batch_size, pool)
+        else:
+            yield from _async_map(f, partitions, pool.executor)
+    finally:
+        pool.shutdown()
+
+
+def _async_map(
+    f: Callable[..., OutputType], partitions: Iterable[List[Tuple]], executor: Executor
+) -> Generator[OutputType, None, None]:
+    async_mapper = _make_async_mapper(f, executor)
     loop = asyncio.new_event_loop()
 
     try:
@@ -145,9 +342,9 @@ def pmap(
         loop.close()
 
 
-def _make_async_mapper(f: Callable[..., OutputType]):
+def _make_async_mapper(f: Callable[..., OutputType], executor: Optional[Executor] = None):
     async def async_f(loop, args) -> OutputType:
-        return await _run_in_background(f, loop, args, {})
+        return await _run_in_background(f, loop, args, {}, executor)
 
     async def async_mapper(loop, items: List[Tuple]) -> List[OutputType]:
         tasks = [loop.create_task(async_f(loop, item)) for item in items]
@@ -174,5 +371,104 @@ def _make_async_mapper(f: Callable[..., OutputType]):
     return async_mapper
 
 
-def _run_in_background(f: Callable[..., OutputType], loop, args, kwargs) -> Coroutine[Any, Any, OutputType]:
-    return loop.run_in_executor(None, lambda: f(*args, **kwargs))
+def _run_in_background(
+    f: Callable[..., OutputType], loop, args, kwargs, executor: Optional[Executor] = None
+) -> Coroutine[Any, Any, OutputType]:
+    return loop.run_in_executor(executor, functools.partial(f, *args, **kwargs))
+
+
+def _batch_map(
+    f: Callable[..., OutputType], partitions: Iterable[List[Tuple]], batch_size: Union[int, str], pool: WorkerPool
+) -> Generator[OutputType, None, None]:
+    auto = batch_size == _AUTO_BATCH_SIZE
+    positive_int = isinstance(batch_size, int) and not isinstance(batch_size, bool) and batch_size > 0
+    assert auto or positive_int, f'Batch size must be a positive int, "{_AUTO_BATCH_SIZE}" (or None)'
+
+    sizer = _BatchSizer(pool.max_workers, None if auto else batch_size)  # type: ignore
+
+    for chunk in partitions:
+        yield from _run_batches(pool.executor, f, chunk, sizer)
+
+
+def _run_batches(executor: Executor, f: Callable[..., OutputType], items: List[Tuple], sizer: "_BatchSizer"):
+    futures: List[Future] = []
+    pending: Set[Future] = set()
+    position = 0
+
+    while position < len(items) or pending:
+        while position < len(items) and len(pending) < sizer.max_pending:
+            size = sizer.next_size(len(items) - position)
+            future = executor.submit(_run_batch, f, items[position : position + size])
+            futures.append(future)
+            pending.add(future)
+            position += size
+
+        done, pending = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            batch_results, _, duration = future.result()
+            sizer.record(len(batch_results), duration)
+
+    results = []
+    exceptions = []
+    for future in futures:
+        batch_results, batch_exceptions, _ = future.result()
+        results.extend(batch_results)
+        exceptions.extend(batch_exceptions)
+
+    if exceptions:
+        raise PMapException(results, exceptions)
+
+    return results
+
+
+def _run_batch(f: Callable[..., OutputType], items: List[Tuple]) -> Tuple[List[Any], List[Exception], float]:
+    results: List[Any] = []
+    exceptions = []
+
+    start = time.perf_counter()
+    for args in items:
+        try:
+            results.append(f(*args))
+        except Exception as e:
+            results.append(e)
+            exceptions.append(e)
+
+    return results, exceptions, time.perf_counter() - start
+
+
+class _BatchSizer:
+    """Chooses how many items to send to a worker at once. Batches start
+    with a single item, and then grow so that each batch takes about
+    _TARGET_BATCH_SECONDS, without ever giving one worker more than its
+    share of the remaining items.
+    """
+
+    def __init__(self, workers: int, fixed_size: Optional[int] = None):
+        self.workers = workers
+        self.fixed_size = fixed_size
+        self.item_seconds: Optional[float] = None
+
+        # enough batches in flight to keep every worker busy, while
+        # keeping each wait() over the pending batches cheap
+        self.max_pending = workers * 2
+
+    def next_size(self, remaining: int) -> int:
+        if self.fixed_size is not None:
+            return self.fixed_size
+
+        if self.item_seconds is None:
+            return 1
+
+        target = int(_TARGET_BATCH_SECONDS / self.item_seconds) if self.item_seconds > 0 else remaining
+        fair_share = -(-remaining // self.workers)
+        return max(1, min(target, fair_share))
+
+    def record(self, count: int, duration: float):
+        if self.fixed_size is not None or count == 0:
+            return
+
+        item_seconds = duration / count
+        if self.item_seconds is None:
+            self.item_seconds = item_seconds
+        else:
+            self.item_seconds = (self.item_seconds + item_seconds) / 2
@@ -0,0 +1,296 @@
+import atexit
+import logging
+import os
+import queue
+import sys
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.thread import BrokenThreadPool
+from multiprocessing import util
+from typing import Any, Callable, Dict, List, Optional
+
+try:
+    from concurrent.futures import InterpreterPoolExecutor  # type: ignore
+except ImportError:  # python < 3.14
+    InterpreterPoolExecutor = None
+
+THREAD_BACKEND = "thread"
+PROCESS_BACKEND = "process"
+INTERPRETER_BACKEND = "interpreter"
+AUTO_BACKEND = "auto"
+BACKENDS = (THREAD_BACKEND, PROCESS_BACKEND, INTERPRETER_BACKEND, AUTO_BACKEND)
+
+LOGGER = logging.getLogger(__name__)
+
+_worker = threading.local()
+
+_shared_pools: Dict[str, "WorkerPool"] = {}
+_shared_pools_lock = threading.Lock()
+
+
+def worker_context() -> Any:
+    """Returns the resource created by the `initializer` passed to pmap,
+    for the worker that is currently executing. Each worker calls the
+    initializer once, so the resource (for example a database
+    connection) is reused by every item that worker processes.
+
+    :return: The value returned by the initializer in this worker
+
+    :raise: RuntimeError if not called from within a pmap worker that
+        has an initializer
+    """
+
+    try:
+        return _worker.resource
+    except AttributeError:
+        raise RuntimeError("worker_context() must be called from a pmap worker with an initializer") from None
+
+
+class WorkerPool:
+    """An executor for a single pmap execution, running `initializer`
+    once in every worker and `teardown` on each worker's resource when
+    the pool is shut down.
+
+    :param backend: One of "thread", "process", "interpreter" or
+        "auto" (see `resolve_backend`)
+    :param max_workers: (optional) The maximum number of workers, uses
+        the executor's default if None
+    :param initializer: (optional) A function of no arguments called
+        once per worker, whose result is available to the mapped
+        function through `pbatch.worker_context()`
+    :param teardown: (optional) A function called with each worker's
+        resource when the pool is shut down, from within that worker
+    """
+
+    def __init__(
+        self,
+        backend: str = THREAD_BACKEND,
+        max_workers: Optional[int] = None,
+        initializer: Optional[Callable[[], Any]] = None,
+        teardown: Optional[Callable[[Any], Any]] = None,
+    ):
+        assert teardown is None or initializer is not None, "A teardown requires an initializer"
+
+        backend = resolve_backend(backend)
+        self.backend = backend
+        self.max_workers = max_workers or default_max_workers(backend)
+
+        self.executor: Executor
+        if backend == INTERPRETER_BACKEND:
+            interpreter_initializer = None if initializer is None else _initialize_interpreter
+            self.executor = InterpreterPoolExecutor(
+                self.max_workers, initializer=interpreter_initializer, initargs=(initializer, teardown)
+            )
+        elif backend == PROCESS_BACKEND:
+            process_initializer = None if initializer is None else _initialize_process
+            self.executor = ProcessPoolExecutor(
+                self.max_workers, initializer=process_initializer, initargs=(initializer, teardown)
+            )
+        elif initializer is not None:
+            self.executor = _ResourceThreadPoolExecutor(self.max_workers, initializer, teardown)
+        else:
+            self.executor = ThreadPoolExecutor(self.max_workers)
+
+    def shutdown(self):
+        """Waits for all submitted work to finish, and for every worker to
+        tear down its resource. Each worker tears down its own resource
+        as it exits: from within the thread that created it for threads
+        (so resources tied to a thread, like sqlite connections, can be
+        closed), and within the process or interpreter otherwise. An
+        exception raised by a teardown is logged, and does not prevent
+        the other resources from being torn down.
+        """
+
+        self.executor.shutdown()
+
+
+class _ResourceThreadPoolExecutor(Executor):
+    """A pool of threads that each call `initializer` when they start,
+    make its result available through `worker_context()`, and call
+    `teardown` with it just before they exit.
+
+    Threads are started as work is submitted (up to `max_workers`) and
+    reused while idle, like ThreadPoolExecutor, which has no way to run
+    code in a worker thread as it exits.
+    """
+
+    def __init__(self, max_workers: int, initializer: Callable[[], Any], teardown: Optional[Callable[[Any], Any]]):
+        self.max_workers = max_workers
+        self.initializer = initializer
+        self.teardown = teardown
+
+        self._queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+        self._threads: List[threading.Thread] = []
+        self._idle = threading.Semaphore(0)
+        self._lock = threading.Lock()
+        self._shutdown = False
+        self._broken = False
+
+    def submit(self, fn, *args, **kwargs) -> Future:  # type: ignore
+        with self._lock:
+            if self._broken:
+                raise BrokenThreadPool("A worker initializer failed, the pool is not usable anymore")
+            if self._shutdown:
+                raise RuntimeError("cannot schedule new futures after shutdown")
+
+            future: Future = Future()
+            self._queue.put((future, fn, args, kwargs))
+
+            if not self._idle.acquire(blocking=False) and len(self._threads) < self.max_workers:
+                thread = threading.Thread(target=self._work, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+
+            return future
+
+    def shutdown(self, wait: bool = True, **kwargs):
+        with self._lock:
+            self._shutdown = True
+            # one exit signal for each thread
+            for _ in self._threads:
+                self._queue.put(None)
+
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def _work(self):
+        try:
+            resource = _worker.resource = self.initializer()
+        except BaseException:
+            LOGGER.exception("Exception in initializer:")
+            self._break()
+            return
+
+        try:
+            while True:
+                work_item = self._queue.get()
+                if work_item is None:
+                    return
+
+                future, fn, args, kwargs = work_item
+                del work_item
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as e:
+                        future.set_exception(e)
+
+                del future
+                self._idle.release()
+        finally:
+            del _worker.resource
+            _teardown(self.teardown, resource)
+
+    def _break(self):
+        with self._lock:
+            self._broken = True
+
+            # fail everything still waiting, since there may be no
+            # worker left to run it
+            while True:
+                try:
+                    work_item = self._queue.get_nowait()
+                except queue.Empty:
+                    return
+
+                if work_item is not None:
+                    future = work_item[0]
+                    if future.set_running_or_notify_cancel():
+                        future.set_exception(BrokenThreadPool("A worker initializer failed"))
+                else:
+                    # leave exit signals for the other threads
+                    self._queue.put(None)
+                    return
+
+
+def _teardown(teardown: Optional[Callable[[Any], Any]], resource: Any):
+    if teardown is None:
+        return
+
+    try:
+        teardown(resource)
+    except Exception:
+        LOGGER.exception("Exception in teardown:")
+
+
+def _initialize_process(initializer: Callable[[], Any], teardown: Optional[Callable[[Any], Any]]):
+    resource = _worker.resource = initializer()
+    if teardown is not None:
+        # worker processes exit without running atexit handlers, but
+        # they do run multiprocessing finalizers
+        util.Finalize(None, teardown, args=(resource,), exitpriority=0)
+
+
+def _initialize_interpreter(initializer: Callable[[], Any], teardown: Optional[Callable[[Any], Any]]):
+    resource = _worker.resource = initializer()
+    if teardown is not None:
+        # each interpreter runs its own atexit handlers when it is
+        # finalized, which happens as the pool shuts down
+        atexit.register(teardown, resource)
+
+
+def resolve_backend(backend: str) -> str:
+    """Returns the backend that is actually used when `backend` is
+    requested, based on what the running interpreter supports.
+
+    - "interpreter" uses one subinterpreter per worker (each with its
+      own GIL) through concurrent.futures.InterpreterPoolExecutor, and
+      falls back to "thread" before python 3.14
+    - "auto" uses "thread" on free-threaded builds with the GIL
+      disabled, otherwise "interpreter" when available, otherwise
+      "thread"
+
+    :param backend: One of "thread", "process", "interpreter" or "auto"
+
+    :return: One of "thread", "process" or "interpreter"
+    """
+
+    assert backend in BACKENDS, f"Backend must be one of {', '.join(BACKENDS)}"
+
+    if backend == AUTO_BACKEND:
+        if not gil_enabled():
+            return THREAD_BACKEND
+        backend = INTERPRETER_BACKEND
+
+    if backend == INTERPRETER_BACKEND and InterpreterPoolExecutor is None:
+        return THREAD_BACKEND
+
+    return backend
+
+
+def gil_enabled() -> bool:
+    """Whether the GIL is currently enabled, which is always the case
+    except on free-threaded builds (python 3.13+)
+    """
+
+    is_gil_enabled = getattr(sys, "_is_gil_enabled", None)
+    return True if is_gil_enabled is None else is_gil_enabled()
+
+
+def shared_executor(backend: str = THREAD_BACKEND) -> Executor:
+    """Returns an executor of the given backend that lives for the rest of
+    the program, shared by everything that uses it (such as postponed
+    functions on the process and interpreter backends), so that
+    workers are reused rather than started for every call
+    """
+
+    backend = resolve_backend(backend)
+
+    with _shared_pools_lock:
+        if backend not in _shared_pools:
+            _shared_pools[backend] = WorkerPool(backend)
+
+        return _shared_pools[backend].executor
+
+
+def default_max_workers(backend: str = THREAD_BACKEND) -> int:
+    if backend in (PROCESS_BACKEND, INTERPRETER_BACKEND):
+        # matches the default of ProcessPoolExecutor. Interpreters are
+        # only worth their startup cost for CPU-bound work, which gains
+        # nothing from more workers than cores
+        return os.cpu_count() or 1
+
+    # matches the default of ThreadPoolExecutor (and therefore of the
+    # asyncio default executor)
+    return min(32, (os.cpu_count() or 1) + 4)
@@ -0,0 +1,132 @@
+import functools
+
+import pytest
+
+import pbatch
+from pbatch import workers
+
+BACKENDS = ["thread", "process", "interpreter", "auto"]
+
+requires_interpreters = pytest.mark.skipif(
+    workers.InterpreterPoolExecutor is None, reason="Requires concurrent.futures.InterpreterPoolExecutor"
+)
+
+# subinterpreters cannot import this test module, so the functions sent
+# to them are built from eval(), with the single argument they are
+# called with (an item, or a worker's resource) as its globals
+_CONNECT = "{'log': open(LOG_PATH, 'a'), 'id': __import__('threading').get_ident()}"
+_QUERY = "(x * 2, __import__('pbatch').worker_context()['id'])"
+_CLOSE = "(log.write('%d\\n' % id), log.close())"
+
+
+@pytest.fixture
+def gil_enabled(monkeypatch):
+    monkeypatch.setattr(workers, "gil_enabled", lambda: True)
+
+
+@pytest.fixture
+def gil_disabled(monkeypatch):
+    monkeypatch.setattr(workers, "gil_enabled", lambda: False)
+
+
+@pytest.fixture
+def no_interpreters(monkeypatch):
+    monkeypatch.setattr(workers, "InterpreterPoolExecutor", None)
+
+
+@pytest.fixture
+def interpreters(monkeypatch):
+    monkeypatch.setattr(workers, "InterpreterPoolExecutor", object())
+
+
+def test_resolve_backend():
+    assert workers.resolve_backend("thread") == "thread"
+    assert workers.resolve_backend("process") == "process"
+
+    with pytest.raises(AssertionError):
+        workers.resolve_backend("fiber")
+
+
+@pytest.mark.usefixtures("no_interpreters")
+def test_resolve_backend_without_interpreters():
+    assert workers.resolve_backend("interpreter") == "thread"
+    assert workers.resolve_backend("auto") == "thread"
+
+
+@pytest.mark.usefixtures("interpreters", "gil_enabled")
+def test_resolve_backend_with_interpreters():
+    assert workers.resolve_backend("interpreter") == "interpreter"
+    assert workers.resolve_backend("auto") == "interpreter"
+
+
+@pytest.mark.usefixtures("interpreters", "gil_disabled")
+def test_resolve_backend_free_threaded():
+    assert workers.resolve_backend("interpreter") == "interpreter"
+    assert workers.resolve_backend("auto") == "thread"
+
+
+@pytest.mark.parametrize("batch_size", [None, "auto"])
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_pmap_backends(backend, batch_size):
+    assert list(pbatch.pmap(abs, [-1, 2, -3], chunk_size=2, batch_size=batch_size, backend=backend)) == [1, 2, 3]
+    assert list(pbatch.pmap(pow, [1, 2, 3], [2, 2, 2], batch_size=batch_size, backend=backend)) == [1, 4, 9]
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_pmap_backend_exception(backend):
+    with pytest.raises(pbatch.PMapException) as info:
+        list(pbatch.pmap(int, ["1", "two", "3"], backend=backend))
+
+    assert info.value.results[0] == 1
+    assert info.value.results[2] == 3
+    assert len(info.value.exceptions) == 1
+    assert isinstance(info.value.exceptions[0], ValueError)
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_postpone_backends(backend):
+    a = pbatch.postpone(abs, -3, _pbatch_backend=backend)
+    b = pbatch.postpone(pow, a, 2, _pbatch_backend=backend)
+
+    assert pbatch.wait_all([a, b]) == [3, 9]
+
+
+def test_postpone_invalid_backend():
+    with pytest.raises(AssertionError):
+        pbatch.postpone(abs, -3, _pbatch_backend="fiber")
+
+
+@pytest.mark.parametrize("backend", ["thread", pytest.param("interpreter", marks=requires_interpreters)])
+def test_initializer_teardown_backends(tmp_path, backend):
+    log_path = tmp_path / "teardown.txt"
+
+    results = list(
+        pbatch.pmap(
+            functools.partial(eval, _QUERY),
+            [{"x": x} for x in range(10)],
+            backend=backend,
+            initializer=functools.partial(eval, _CONNECT, {"LOG_PATH": str(log_path)}),
+            teardown=functools.partial(eval, _CLOSE),
+        )
+    )
+
+    assert [result for result, _ in results] == list(range(0, 20, 2))
+
+    # every worker that processed items has torn down its resource
+    worker_ids = {worker_id for _, worker_id in results}
+    torn_down_ids = list(map(int, log_path.read_text().split()))
+    assert worker_ids <= set(torn_down_ids)
+    assert len(torn_down_ids) == len(set(torn_down_ids))
+
+
+@requires_interpreters
+def test_interpreter_postpone():
+    a = pbatch.postpone(abs, -3, _pbatch_backend="interpreter")
+    b = pbatch.postpone(pow, a, 2, _pbatch_backend="interpreter")
+    c = pbatch.postpone(int, "not an int", _pbatch_backend="interpreter")
+
+    assert a.wait() == 3
+    assert b.wait() == 9
+
+    with pytest.raises(ValueError):
+        c.wait()
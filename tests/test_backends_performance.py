@@ -0,0 +1,46 @@
+import os
+import time
+
+import pytest
+
+import pbatch
+from pbatch import workers
+
+pytestmark = [pytest.mark.performance]
+
+# sum() over a range holds the GIL for its whole duration, and (being a
+# builtin) can be sent to any kind of worker
+CPU_BOUND_ITEMS = [range(5_000_000)] * 16
+
+
+def time_pmap(backend):
+    start = time.time()
+    results = list(pbatch.pmap(sum, CPU_BOUND_ITEMS, backend=backend, batch_size=1))
+    end = time.time()
+
+    assert results == [sum(CPU_BOUND_ITEMS[0])] * len(CPU_BOUND_ITEMS)
+    return end - start
+
+
+@pytest.mark.parametrize("backend", ["thread", "process", "interpreter", "auto"])
+def test_backend_startup(backend):
+    start = time.time()
+    assert list(pbatch.pmap(abs, [-1], backend=backend)) == [1]
+    end = time.time()
+
+    # a single worker starts (and shuts down) in well under a second
+    assert end - start < 1
+
+
+@pytest.mark.skipif((os.cpu_count() or 1) < 2, reason="Requires multiple cores")
+@pytest.mark.skipif(
+    workers.gil_enabled() and workers.InterpreterPoolExecutor is None, reason="Requires subinterpreters or no GIL"
+)
+def test_cpu_bound_parallelism():
+    start = time.time()
+    list(map(sum, CPU_BOUND_ITEMS))
+    end = time.time()
+    serial_duration = end - start
+
+    # on free-threaded builds "auto" uses threads, on others interpreters
+    assert time_pmap("auto") < serial_duration * 0.75
@@ -4,9 +4,11 @@ def test_module_import():
     pbatch.partition
     pbatch.pmap
     pbatch.postpone
+    pbatch.wait_all
     pbatch.PMapException
+    pbatch.worker_context
     pbatch.VERSION
 
 
 def test_function_import():
-    from pbatch import VERSION, PMapException, partition, pmap, postpone  # noqa: F401
+    from pbatch import VERSION, PMapException, partition, pmap, postpone, wait_all, worker_context  # noqa: F401
@@ -34,13 +34,25 @@ def test_invalid_arguments():
         pbatch.pmap(lambda x: x, [1, 2, 3], [4, 5, 6], chunk_size=2, foo="bar")
 
 
+@pytest.mark.parametrize("batch_size", [0, -1, 1.5, "fast", True])
+def test_invalid_batch_size(batch_size):
+    with pytest.raises(AssertionError):
+        list(pbatch.pmap(lambda x: x, [1, 2, 3], batch_size=batch_size))
+
+
+@pytest.mark.parametrize("batch_size", [None, 1, 2, 100, "auto"])
 @pytest.mark.parametrize("chunk_size", [None, 1, 2, 3, 4])
-def test_chunk_size(chunk_size):
+def test_chunk_size(chunk_size, batch_size):
     def exp(x, power=2):
         return x ** power
 
-    assert list(pbatch.pmap(exp, [1, 2, 3], chunk_size=chunk_size)) == [1, 4, 9]
-    assert list(pbatch.pmap(exp, [1, 2, 3], [3, 3, 3], chunk_size=chunk_size)) == [1, 8, 27]
+    assert list(pbatch.pmap(exp, [1, 2, 3], chunk_size=chunk_size, batch_size=batch_size)) == [1, 4, 9]
+    assert list(pbatch.pmap(exp, [1, 2, 3], [3, 3, 3], chunk_size=chunk_size, batch_size=batch_size)) == [1, 8, 27]
+
+
+@pytest.mark.parametrize("batch_size", [1, 7, "auto"])
+def test_batched_many_items(batch_size):
+    assert list(pbatch.pmap(lambda x: x * 2, range(10000), batch_size=batch_size)) == list(range(0, 20000, 2))
 
 
 @pytest.mark.parametrize(
@@ -55,7 +67,8 @@ def test_chunk_size(chunk_size):
         ([1, 2, "not an int"], [1, 4, ValueError("Expected an int")]),
     ],
 )
-def test_pmap(items, expected):
+@pytest.mark.parametrize("batch_size", [None, 1, 2, "auto"])
+def test_pmap(items, expected, batch_size):
     def square(x):
         if not isinstance(x, int):
             raise ValueError("Expected an int")
@@ -65,7 +78,7 @@ def test_pmap(items, expected):
         expected_exceptions = [result for result in expected if isinstance(result, Exception)]
 
         with pytest.raises(pbatch.PMapException) as info:
-            list(pbatch.pmap(square, items))
+            list(pbatch.pmap(square, items, batch_size=batch_size))
 
         assert str(info.value) == str(expected)
         assert repr(info.value) == repr(expected)
@@ -73,7 +86,7 @@ def test_pmap(items, expected):
         assert _stringify_exceptions(info.value.results) == _stringify_exceptions(expected)
         assert all(actual.args == expected.args for actual, expected in zip(info.value.exceptions, expected_exceptions))
     else:
-        assert list(pbatch.pmap(square, items)) == expected
+        assert list(pbatch.pmap(square, items, batch_size=batch_size)) == expected
 
 
 @pytest.mark.parametrize(
@@ -149,14 +162,15 @@ def test_lazy_pmap():
     assert seen == {1, 2, 3, 4}
 
 
-def test_lazy_pmap_chunked():
+@pytest.mark.parametrize("batch_size", [None, 1, "auto"])
+def test_lazy_pmap_chunked(batch_size):
     seen = set()
 
     def square(x):
         seen.add(x)
         return x ** 2
 
-    lazy_results = pbatch.pmap(square, [1, 2, 3, 4], chunk_size=2)
+    lazy_results = pbatch.pmap(square, [1, 2, 3, 4], chunk_size=2, batch_size=batch_size)
     assert seen == set()
 
     assert next(lazy_results) == 1
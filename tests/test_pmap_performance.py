@@ -43,3 +43,31 @@ def test_pmap_performance(chunk_size, include_power):
         assert results == [0, 1, 4, 9, 16, 25, 36, 49, 64, 81]
 
     assert duration < max_time
+
+
+@pytest.mark.parametrize("batch_size", [1000, "auto"])
+def test_batched_pmap_overhead(batch_size):
+    def increment(x):
+        return x + 1
+
+    items = range(100000)
+    results, duration = time_list(pbatch.pmap, increment, items, batch_size=batch_size)
+
+    assert results == [x + 1 for x in items]
+    # per-item overhead should stay within a few microseconds
+    assert duration / len(items) < 5e-6
+
+
+@pytest.mark.parametrize("batch_size", [1, 10])
+def test_many_batches_overhead(batch_size):
+    def increment(x):
+        return x + 1
+
+    items = range(20000)
+    batched, batched_duration = time_list(pbatch.pmap, increment, items, batch_size=batch_size)
+    unbatched, unbatched_duration = time_list(pbatch.pmap, increment, items)
+
+    assert batched == unbatched == [x + 1 for x in items]
+    # thousands of batches in flight must not cost more than scheduling
+    # every item on its own
+    assert batched_duration < unbatched_duration
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 
 import pytest
 
@@ -41,3 +42,141 @@ def test_exception():
             postponement.wait()
 
         assert info.value.args == ("Raised exception",)
+
+
+def test_dependencies():
+    def add(a, b):
+        return a + b
+
+    a = pbatch.postpone(add, 1, 2)
+    b = pbatch.postpone(add, a, 10)
+    c = pbatch.postpone(add, a, b=b)
+    d = pbatch.postpone(add, c, c)
+
+    assert d.wait() == 32
+    assert pbatch.wait_all([a, b, c, d]) == [3, 13, 16, 32]
+
+
+def test_dependency_exception():
+    def raises_exception():
+        raise ValueError("Raised exception")
+
+    called = False
+
+    def dependent(x):
+        nonlocal called
+        called = True
+        return x
+
+    a = pbatch.postpone(raises_exception)
+    b = pbatch.postpone(dependent, a)
+    c = pbatch.postpone(dependent, b)
+
+    with pytest.raises(ValueError) as info:
+        c.wait()
+
+    assert info.value.args == ("Raised exception",)
+    assert not called
+
+
+def test_cancel_waiting_dependent():
+    release = threading.Event()
+    ran = []
+
+    def blocked():
+        release.wait()
+        return 0
+
+    def side_effect(x):
+        ran.append(x)
+        return x
+
+    a = pbatch.postpone(blocked)
+    b = pbatch.postpone(side_effect, a)
+    c = pbatch.postpone(side_effect, b)
+
+    try:
+        b.cancel()
+    finally:
+        release.set()
+
+    assert a.wait() == 0
+
+    # d is notified of a finishing after b would have been, so once d
+    # is done, b has had every chance to start
+    d = pbatch.postpone(side_effect, a)
+    assert d.wait() == 0
+
+    with pytest.raises(asyncio.CancelledError):
+        b.wait()
+
+    with pytest.raises(asyncio.CancelledError):
+        c.wait()
+
+    assert ran == [0]
+
+
+def test_cancel_running_dependency():
+    release = threading.Event()
+    ran = []
+
+    def blocked():
+        release.wait()
+        return 0
+
+    def side_effect(x):
+        ran.append(x)
+        return x
+
+    a = pbatch.postpone(blocked)
+    b = pbatch.postpone(side_effect, a)
+    c = pbatch.postpone(side_effect, b)
+
+    try:
+        a.cancel()
+    finally:
+        release.set()
+
+    for postponement in (a, b, c):
+        with pytest.raises(asyncio.CancelledError):
+            postponement.wait()
+
+    assert ran == []
+
+
+def test_nested_wait():
+    def parent(x):
+        return pbatch.postpone(lambda: x).wait()
+
+    # more parents than a bounded pool would have workers, all blocked
+    # on their children at once
+    parents = [pbatch.postpone(parent, x) for x in range(40)]
+    assert sum(pbatch.wait_all(parents)) == 780
+
+
+def test_wait_all():
+    assert pbatch.wait_all([]) == []
+    assert pbatch.wait_all(pbatch.postpone(lambda x: x * 2, x) for x in range(5)) == [0, 2, 4, 6, 8]
+
+
+def test_wait_all_exception():
+    def check(x):
+        if x == 2:
+            raise ValueError("Number is 2")
+        return x
+
+    a = pbatch.postpone(check, 1)
+    b = pbatch.postpone(check, 2)
+    c = pbatch.postpone(check, b)
+    d = pbatch.postpone(check, 3)
+
+    with pytest.raises(pbatch.PMapException) as info:
+        pbatch.wait_all([a, b, c, d])
+
+    results = info.value.results
+    exceptions = info.value.exceptions
+
+    assert results[0] == 1
+    assert results[3] == 3
+    assert exceptions == [results[1], results[2]]
+    assert all(e.args == ("Number is 2",) for e in exceptions)
@@ -1,4 +1,5 @@
 import asyncio
+import threading
 import time
 
 import pytest
@@ -11,21 +12,23 @@ pytestmark = [pytest.mark.performance]
 
 
 def test_postpone_performance():
-    executed = finished = False
+    executed = threading.Event()
+    finished = False
 
     def add(a, b, c=None):
-        nonlocal executed, finished
-        executed = True
+        nonlocal finished
+        executed.set()
         time.sleep(PERFORMANCE_SLEEP_TIME)
         finished = True
         return a + b + c
 
-    assert not executed
+    assert not executed.is_set()
     assert not finished
 
     postponement = pbatch.postpone(add, 1, 2, c=100)
 
-    assert executed
+    # starts in the background without waiting to be asked
+    assert executed.wait(PERFORMANCE_SLEEP_TIME / 2)
     assert not finished
 
     time.sleep(PERFORMANCE_SLEEP_TIME / 2)
@@ -37,7 +40,7 @@ def test_postpone_performance():
     duration = end - start
     assert duration < PERFORMANCE_SLEEP_TIME
 
-    assert executed
+    assert executed.is_set()
     assert finished
 
     assert postponement.wait() == 103
@@ -58,3 +61,37 @@ def test_cancel():
     end = time.time()
     duration = end - start
     assert duration < PERFORMANCE_SLEEP_TIME
+
+
+def test_concurrent_branches():
+    def sleep_add(*numbers):
+        time.sleep(PERFORMANCE_SLEEP_TIME)
+        return sum(numbers)
+
+    start = time.time()
+
+    root = pbatch.postpone(sleep_add, 1)
+    left = pbatch.postpone(sleep_add, root, 10)
+    right = pbatch.postpone(sleep_add, root, 100)
+    joined = pbatch.postpone(sleep_add, left, right)
+
+    assert pbatch.wait_all([root, left, right, joined]) == [1, 11, 101, 112]
+
+    end = time.time()
+    duration = end - start
+
+    # three levels of the graph, with both branches running at once
+    assert duration < PERFORMANCE_SLEEP_TIME * 4
+
+
+def test_many_blocking_postponements():
+    start = time.time()
+
+    postponements = [pbatch.postpone(time.sleep, PERFORMANCE_SLEEP_TIME) for _ in range(40)]
+    pbatch.wait_all(postponements)
+
+    end = time.time()
+    duration = end - start
+
+    # all of them sleep at the same time
+    assert duration < PERFORMANCE_SLEEP_TIME * 2
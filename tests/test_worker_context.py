@@ -0,0 +1,220 @@
+import functools
+import itertools
+import os
+import threading
+import time
+from concurrent.futures.thread import BrokenThreadPool
+
+import pytest
+
+import pbatch
+
+
+class Connection:
+    counter = itertools.count()
+
+    def __init__(self):
+        self.id = next(self.counter)
+        self.thread = threading.get_ident()
+        self.closed = False
+        self.closed_in_thread = None
+
+    def close(self):
+        self.closed = True
+        self.closed_in_thread = threading.get_ident() == self.thread
+
+
+def _query(x):
+    connection = pbatch.worker_context()
+    assert not connection.closed
+    return x * 2, connection.id
+
+
+def _slow_query(x):
+    # slow enough that every worker thread started picks up an item
+    time.sleep(0.01)
+    return _query(x)
+
+
+def _open_process_connection():
+    return os.getpid()
+
+
+def _process_query(x):
+    return x, pbatch.worker_context()
+
+
+def _record_teardown(path, pid):
+    with open(path, "a") as f:
+        f.write(f"{pid}\n")
+
+
+def test_worker_context_outside_worker():
+    with pytest.raises(RuntimeError):
+        pbatch.worker_context()
+
+
+def test_worker_context_without_initializer():
+    with pytest.raises(pbatch.PMapException) as info:
+        list(pbatch.pmap(lambda _: pbatch.worker_context(), [1, 2]))
+
+    assert all(isinstance(e, RuntimeError) for e in info.value.exceptions)
+
+
+def test_teardown_requires_initializer():
+    with pytest.raises(AssertionError):
+        list(pbatch.pmap(lambda x: x, [1], teardown=lambda _: None))
+
+
+def test_invalid_backend():
+    with pytest.raises(AssertionError):
+        list(pbatch.pmap(lambda x: x, [1], backend="fiber"))
+
+
+@pytest.mark.parametrize("batch_size", [None, 1, "auto"])
+@pytest.mark.parametrize("chunk_size", [None, 3])
+def test_thread_initializer(chunk_size, batch_size):
+    connections = []
+    lock = threading.Lock()
+
+    def connect():
+        connection = Connection()
+        with lock:
+            connections.append(connection)
+        return connection
+
+    results = list(
+        pbatch.pmap(
+            _slow_query,
+            range(20),
+            chunk_size=chunk_size,
+            batch_size=batch_size,
+            initializer=connect,
+            teardown=Connection.close,
+        )
+    )
+
+    assert [result for result, _ in results] == list(range(0, 40, 2))
+
+    # each worker connects once, and every connection is torn down
+    assert len(connections) <= pbatch.workers.default_max_workers()
+    assert len({connection_id for _, connection_id in results}) == len(connections)
+    assert all(connection.closed for connection in connections)
+
+
+@pytest.mark.parametrize("batch_size", [None, "auto"])
+def test_thread_teardown_in_worker_thread(batch_size):
+    connections = []
+    lock = threading.Lock()
+
+    def connect():
+        connection = Connection()
+        with lock:
+            connections.append(connection)
+        return connection
+
+    results = list(
+        pbatch.pmap(_query, range(20), batch_size=batch_size, initializer=connect, teardown=Connection.close)
+    )
+
+    assert [result for result, _ in results] == list(range(0, 40, 2))
+    assert connections
+    assert all(connection.closed_in_thread for connection in connections)
+
+
+def test_thread_teardown_exception(caplog):
+    connections = []
+    lock = threading.Lock()
+
+    def connect():
+        connection = Connection()
+        with lock:
+            connections.append(connection)
+        return connection
+
+    def close(connection):
+        connection.close()
+        raise ValueError("Close failed")
+
+    assert list(pbatch.pmap(lambda x: x, range(20), initializer=connect, teardown=close)) == list(range(20))
+
+    # every connection is still closed, and the failures are logged
+    assert connections
+    assert all(connection.closed for connection in connections)
+    assert len([record for record in caplog.records if record.exc_info]) == len(connections)
+
+
+def test_teardown_after_exception():
+    connections = []
+
+    def connect():
+        connection = Connection()
+        connections.append(connection)
+        return connection
+
+    def fail(_):
+        raise ValueError("Query failed")
+
+    with pytest.raises(pbatch.PMapException):
+        list(pbatch.pmap(fail, [1, 2, 3], initializer=connect, teardown=Connection.close))
+
+    assert connections
+    assert all(connection.closed for connection in connections)
+
+
+@pytest.mark.parametrize("batch_size", [None, "auto"])
+def test_process_initializer(tmp_path, batch_size):
+    teardown_path = tmp_path / "teardown.txt"
+
+    results = list(
+        pbatch.pmap(
+            _process_query,
+            range(10),
+            backend="process",
+            batch_size=batch_size,
+            initializer=_open_process_connection,
+            teardown=functools.partial(_record_teardown, teardown_path),
+        )
+    )
+
+    assert [x for x, _ in results] == list(range(10))
+
+    worker_pids = {pid for _, pid in results}
+    assert os.getpid() not in worker_pids
+
+    torn_down_pids = set(map(int, teardown_path.read_text().split()))
+    assert worker_pids <= torn_down_pids
+
+
+def test_late_initializer_failure():
+    calls = itertools.count()
+    connections = []
+
+    def connect():
+        if next(calls) == 1:
+            # fails only once the other worker has processed every item
+            time.sleep(0.3)
+            raise ValueError("Connection failed")
+
+        connection = Connection()
+        connections.append(connection)
+        return connection
+
+    def slow_identity(x):
+        time.sleep(0.05)
+        return x
+
+    assert list(pbatch.pmap(slow_identity, [1, 2], initializer=connect, teardown=Connection.close)) == [1, 2]
+
+    assert len(connections) == 1
+    assert connections[0].closed_in_thread
+
+
+def test_initializer_failure():
+    def connect():
+        raise ValueError("Connection failed")
+
+    with pytest.raises(pbatch.PMapException) as info:
+        list(pbatch.pmap(lambda x: x, [1, 2, 3], initializer=connect))
+
+    assert all(isinstance(e, BrokenThreadPool) for e in info.value.exceptions)